@@ -12,19 +12,50 @@ Usage (example on macOS):
         "/Users/annchapmanprice/Desktop/CorpusMiddelnederlands_1.0" \
         page1_ocr.txt \
         page1_lexical_report.csv
+
+Reference corpus counts are cached in ~/.cache/ocr_middle_dutch/ (shared by
+both confidence scripts) and reused while the corpus is unchanged. To clear
+the cache, delete that folder:
+
+    rm -rf ~/.cache/ocr_middle_dutch
 """
 
+import os
 import re
 import csv
 import sys
+import mmap
+import pickle
+import hashlib
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from operator import itemgetter
 from pathlib import Path
-from math import log
+from math import log1p
+
+
+_TOKEN_RE = re.compile(r"[A-Za-zÀ-ÿ]+")
+# The same letter class matched on raw UTF-8 bytes (À-ÿ is \xc3\x80-\xc3\xbf),
+# so reference files can be scanned without decoding them first.
+_BYTES_TOKEN_RE = re.compile(rb"(?:[A-Za-z]|\xc3[\x80-\xbf])+")
+
+# 👉 Edit these if your corpus uses different extensions.
+# For GTB-related corpora it's often .xml or .vrt, but confirm via `find`.
+ALLOWED_SUFFIXES = (".txt", ".xml", ".vrt", ".csv", ".tsv")
+
+# Reference counts are cached here between runs (shared by both scripts).
+# Delete the folder to force a rebuild.
+CACHE_DIR = Path.home() / ".cache" / "ocr_middle_dutch"
+# Bump this if the cached data changes in a way the key below cannot see
+# (the token pattern itself is already part of the key).
+_CACHE_VERSION = b"1"
 
 
 def tokenize(text: str):
     """
-    Very simple tokenizer:
+    Very simple tokenizer, yielding tokens lazily so that large files
+    are counted without building a full token list:
     - keeps sequences of letters (including extended Latin) as words
     - drops punctuation and digits
     - lowercases everything
@@ -32,8 +63,105 @@ def tokenize(text: str):
     You can later refine this for Middle Dutch-specific normalization
     (e.g. u/v, i/j, etc.) if you like.
     """
-    tokens = re.findall(r"[A-Za-zÀ-ÿ]+", text)
-    return [t.lower() for t in tokens]
+    return (m.group(0).lower() for m in _TOKEN_RE.finditer(text))
+
+
+def _iter_corpus_files(directory):
+    """
+    Recursively yield the paths of files under `directory` whose extension
+    is in ALLOWED_SUFFIXES. os.scandir entries already know whether they
+    are files or directories, so no extra stat() is needed per path.
+    Folders that cannot be read are skipped with a warning.
+    """
+    try:
+        entries = os.scandir(directory)
+    except OSError as e:
+        print(f"Warning: could not read {directory}: {e}", file=sys.stderr)
+        return
+
+    with entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _iter_corpus_files(entry.path)
+            elif entry.is_file() and entry.name.lower().endswith(ALLOWED_SUFFIXES):
+                yield entry.path
+
+
+def _count_file(path: str) -> Counter:
+    """
+    Count the raw (undecoded, not yet lowercased) byte tokens in one
+    reference file. Kept at module level so worker processes can run it.
+    """
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return Counter()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                # map(re.Match.group, ...) keeps the whole per-token path in C:
+                # Counter() counts through its C helper, with no Python-level
+                # generator frame or __missing__ call per token.
+                return Counter(map(re.Match.group, _BYTES_TOKEN_RE.finditer(mm)))
+    except Exception as e:
+        print(f"Warning: could not read {path}: {e}", file=sys.stderr)
+        return Counter()
+
+
+def _reference_cache_path(ref_dir: Path, ref_files) -> Path:
+    """
+    Cache file name for this exact set of reference files, keyed by the
+    token pattern and each file's absolute path, size and modification time. The name starts with
+    a hash of the resolved ref_dir, so each corpus keeps a single cache file.
+    """
+    corpus_id = hashlib.blake2b(
+        str(ref_dir.resolve()).encode("utf-8", "surrogateescape"), digest_size=8
+    ).hexdigest()
+    key = hashlib.blake2b(_CACHE_VERSION, digest_size=16)
+    # Counts built with a different tokenizer must never be reused.
+    key.update(_BYTES_TOKEN_RE.pattern + b"\n")
+    for path in sorted(os.path.abspath(p) for p in ref_files):
+        try:
+            st = os.stat(path)
+        except OSError:
+            # Gone or unreadable since the walk; _count_file will warn about it.
+            continue
+        entry = f"{path}\0{st.st_size}\0{st.st_mtime_ns}\n"
+        key.update(entry.encode("utf-8", "surrogateescape"))
+    return CACHE_DIR / f"ref_counts_{corpus_id}_{key.hexdigest()}.pickle"
+
+
+def _load_cached_counts(cache_file: Path):
+    try:
+        with open(cache_file, "rb") as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Warning: could not read cache {cache_file}: {e}", file=sys.stderr)
+        return None
+
+
+def _save_cached_counts(cache_file: Path, counts: Counter):
+    # Write to a temporary file first so a crashed run never leaves a
+    # half-written cache behind.
+    tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_file, "wb") as f:
+            pickle.dump(counts, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        print(f"Warning: could not write cache {cache_file}: {e}", file=sys.stderr)
+        return
+
+    # Drop caches of earlier versions of the same corpus; they can never
+    # match again and would otherwise pile up with every corpus edit.
+    corpus_prefix = cache_file.name.rsplit("_", 1)[0]
+    for old_file in cache_file.parent.glob(f"{corpus_prefix}_*.pickle"):
+        if old_file != cache_file:
+            try:
+                old_file.unlink()
+            except OSError as e:
+                print(f"Warning: could not remove old cache {old_file}: {e}", file=sys.stderr)
 
 
 def build_reference_counts(ref_dir: Path) -> Counter:
@@ -41,40 +169,51 @@ def build_reference_counts(ref_dir: Path) -> Counter:
     Walk through reference corpus files in ref_dir (recursively),
     tokenize them, and build a word frequency Counter.
 
+    Files are memory-mapped and scanned as UTF-8 bytes in a pool of worker
+    processes; only the distinct tokens are decoded, which avoids holding
+    each file as a decoded str.
+
+    The result is cached in CACHE_DIR and reused as long as no reference
+    file has been added, removed or modified.
+
     IMPORTANT:
-      Adjust `allowed_exts` to match your actual corpus file extensions.
+      Adjust `ALLOWED_SUFFIXES` to match your actual corpus file extensions.
       You can check extensions by running, in Terminal:
 
           cd "/Users/annchapmanprice/Desktop/CorpusMiddelnederlands_1.0"
           find . -maxdepth 2 -type f | head
     """
-    counts = Counter()
-
-    # 👉 Edit this set if your corpus uses different extensions.
-    # For GTB-related corpora it's often .xml or .vrt, but confirm via `find`.
-    allowed_exts = {".txt", ".xml", ".vrt", ".csv", ".tsv"}
+    if not ref_dir.is_dir():
+        print(f"Error: reference corpus folder not found: {ref_dir}", file=sys.stderr)
+        sys.exit(1)
 
-    ref_files = [
-        p for p in ref_dir.rglob("*")
-        if p.is_file() and p.suffix.lower() in allowed_exts
-    ]
+    ref_files = list(_iter_corpus_files(ref_dir))
 
     print(f"Found {len(ref_files)} reference files with allowed extensions.")
 
-    for path in ref_files:
-        try:
-            text = path.read_text(encoding="utf-8", errors="ignore")
-        except Exception as e:
-            print(f"Warning: could not read {path}: {e}", file=sys.stderr)
-            continue
+    cache_file = _reference_cache_path(ref_dir, ref_files)
+    counts = _load_cached_counts(cache_file)
+    if counts is not None:
+        print(f"Loaded cached reference counts from: {cache_file}")
+        return counts
+
+    raw_counts = Counter()
 
-        tokens = tokenize(text)
-        counts.update(tokens)
+    # Files are independent, so count them in parallel and merge.
+    with ProcessPoolExecutor() as executor:
+        for file_counts in executor.map(_count_file, ref_files, chunksize=8):
+            raw_counts.update(file_counts)
+
+    # Decode and lowercase once per distinct raw token, not once per occurrence.
+    counts = Counter()
+    for token, freq in raw_counts.items():
+        counts[token.decode("utf-8").lower()] += freq
 
+    _save_cached_counts(cache_file, counts)
     return counts
 
 
-def compute_lexical_confidence(ref_counts: Counter, word: str) -> float:
+def compute_lexical_confidence(freq_ref: int, log_max: float) -> float:
     """
     Compute a simple lexical confidence score in [0, 1] for a word,
     based only on its frequency in the reference corpus.
@@ -88,18 +227,15 @@ def compute_lexical_confidence(ref_counts: Counter, word: str) -> float:
       - Rare but attested    -> small positive scores
       - Unattested           -> 0.0
 
+    `log_max` is log(1 + max_freq) over the whole reference corpus; it is
+    computed once in build_report rather than once per word.
+
     You can tweak this function later if you prefer a different scaling.
     """
-    freq = ref_counts.get(word, 0)
-    if freq == 0:
-        return 0.0
-
-    max_freq = max(ref_counts.values())
-    if max_freq <= 0:
+    if freq_ref == 0 or log_max <= 0:
         return 0.0
 
-    score = log(1 + freq) / log(1 + max_freq)
-    return float(score)
+    return log1p(freq_ref) / log_max
 
 
 def build_report(ref_dir: str, target_path: str, output_path: str):
@@ -111,29 +247,34 @@ def build_report(ref_dir: str, target_path: str, output_path: str):
     ref_counts = build_reference_counts(ref_dir_path)
     print(f"Reference vocabulary size: {len(ref_counts)} words")
 
+    max_freq = max(ref_counts.values(), default=0)
+    log_max = log1p(max_freq)
+
     # 2) Read and tokenize target OCR text
     print(f"Reading target OCR text: {target_file}")
     target_text = target_file.read_text(encoding="utf-8", errors="ignore")
-    target_tokens = tokenize(target_text)
-    target_counts = Counter(target_tokens)
-
-    # 3) Prepare rows
-    rows = []
-    for word, freq_target in sorted(
-        target_counts.items(),
-        key=lambda wf: (-wf[1], wf[0])
-    ):
-        freq_ref = ref_counts.get(word, 0)
-        in_ref = freq_ref > 0
-        lexical_conf = compute_lexical_confidence(ref_counts, word)
-
-        rows.append({
-            "word": word,
-            "frequency_in_target": freq_target,
-            "frequency_in_reference": freq_ref,
-            "in_reference": in_ref,
-            "lexical_confidence": f"{lexical_conf:.4f}",
-        })
+    target_counts = Counter(tokenize(target_text))
+
+    # 3) Prepare rows. Reference frequencies and scores are computed a
+    #    column at a time with map(); rows are plain tuples in fieldnames order.
+    # Sort by frequency (highest first), then alphabetically: two stable
+    # sorts with C-level keys instead of a Python lambda per comparison.
+    ranked = sorted(target_counts.items())
+    ranked.sort(key=itemgetter(1), reverse=True)
+    freqs_ref = list(map(ref_counts.get, map(itemgetter(0), ranked), repeat(0)))
+
+    # Reference frequencies are Zipfian, so many words share a frequency:
+    # score and format each distinct frequency once and look the rest up.
+    score_of_freq = {
+        freq: f"{compute_lexical_confidence(freq, log_max):.4f}"
+        for freq in set(freqs_ref)
+    }
+    scores = map(score_of_freq.__getitem__, freqs_ref)
+
+    rows = (
+        (word, freq_target, freq_ref, freq_ref > 0, lexical_conf)
+        for (word, freq_target), freq_ref, lexical_conf in zip(ranked, freqs_ref, scores)
+    )
 
     # 4) Write CSV
     fieldnames = [
@@ -144,8 +285,8 @@ def build_report(ref_dir: str, target_path: str, output_path: str):
         "lexical_confidence",
     ]
     with open(output_path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
+        writer = csv.writer(f)
+        writer.writerow(fieldnames)
         writer.writerows(rows)
 
     print(f"Done. Report written to: {output_path}")
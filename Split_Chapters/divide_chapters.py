@@ -2,6 +2,12 @@ import sublime
 import sublime_plugin
 import os
 import re
+from pathlib import Path
+
+# Match the chapter heading pattern (compiled once, when the plugin loads)
+CHAPTER_PATTERN = re.compile(
+    r"(¥%@(?P<num>\d{1,2})\. (?P<name>.+?), (?P<title>Pater|Mater|Procuratrix|Schwester) \((?P<death>†[^)]+)\))"
+)
 
 class DivideChaptersCommand(sublime_plugin.TextCommand):
     def run(self, edit):
@@ -15,47 +21,33 @@ class DivideChaptersCommand(sublime_plugin.TextCommand):
 
         base_dir = os.path.dirname(file_path)
 
-        # Match the chapter heading pattern
-        chapter_pattern = re.compile(
-            r"(¥%@(?P<num>\d{1,2})\. (?P<name>.+?), (?P<title>Pater|Mater|Procuratrix|Schwester) \((?P<death>†[^)]+)\))"
-        )
-
-        # Find all chapter start positions
-        chapters = list(chapter_pattern.finditer(content))
+        # Split on the headings; the captured groups are returned between
+        # the pieces: [prolog, heading, num, name, title, death, text, heading, ...]
+        parts = CHAPTER_PATTERN.split(content)
 
-        if not chapters:
+        if len(parts) == 1:
             sublime.error_message("No chapters found.")
             return
 
         # Save Prolog
-        prolog_text = content[:chapters[0].start()].strip()
+        prolog_text = parts[0].strip()
         if "Prolog" in prolog_text:
-            with open(os.path.join(base_dir, "EProlog.txt"), "w", encoding="utf-8") as f:
-                f.write(prolog_text)
+            Path(base_dir, "EProlog.txt").write_bytes(prolog_text.encode("utf-8"))
 
         # Save each chapter
-        for i, match in enumerate(chapters):
-            start = match.start()
-            end = chapters[i + 1].start() if i + 1 < len(chapters) else len(content)
-            chapter_text = content[start:end].strip()
-
-            num = int(match.group("num"))
-            name = match.group("name")
-            title = match.group("title")
-            death = match.group("death")
+        for i in range(1, len(parts), 6):
+            heading, num, name, title, death, body = parts[i:i + 6]
+            chapter_text = (heading + body).strip()
 
-            num_str = f"{num:02}"
+            num_str = f"{int(num):02}"
             filename = f"E{num_str}. {name}, {title} ({death}).txt"
             filepath = os.path.join(base_dir, filename)
 
-            with open(filepath, "w", encoding="utf-8") as f:
-                f.write(chapter_text)
+            Path(filepath).write_bytes(chapter_text.encode("utf-8"))
 
-        # Save Epilog
-        last_chapter_end = chapters[-1].end()
-        epilog_text = content[last_chapter_end:].strip()
+        # Save Epilog (the text after the last heading)
+        epilog_text = parts[-1].strip()
         if "Epilog" in epilog_text:
-            with open(os.path.join(base_dir, "EEpilog.txt"), "w", encoding="utf-8") as f:
-                f.write(epilog_text)
+            Path(base_dir, "EEpilog.txt").write_bytes(epilog_text.encode("utf-8"))
 
         sublime.message_dialog("Chapters and sections saved.")
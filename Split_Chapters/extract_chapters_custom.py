@@ -2,20 +2,37 @@ import sublime
 import sublime_plugin
 import re
 import os
+from pathlib import Path
+
+# Match chapters using the pattern (compiled once, when the plugin loads).
+# The numeral is matched loosely and checked against ROMAN_NUMERALS after.
+CHAPTER_PATTERN = re.compile(
+    r"((?:\n){3}([IVX]{1,5})\.\n{2}(.*?,))",
+    re.IGNORECASE
+)
+ROMAN_NUMERALS = {
+    "I", "II", "III", "IV", "V", "VI", "VII",
+    "VIII", "IX", "X", "XI", "XII", "XIII",
+}
 
 class ExtractChaptersCustomCommand(sublime_plugin.TextCommand):
     def run(self, edit):
         content = self.view.substr(sublime.Region(0, self.view.size()))
 
-        # Match chapters using the pattern
-        chapter_pattern = re.compile(
-            r"(?:\n){3}(I{1,3}|IV|V|VI{0,3}|IX|X{1,3}|XI{0,2}|XII{0,1}|XIII)\.\n{2}(.*?,)",
-            re.IGNORECASE
-        )
+        # Split on the headings; the captured groups are returned between
+        # the pieces: [front matter, heading, numeral, title line, text, heading, ...]
+        parts = CHAPTER_PATTERN.split(content)
 
-        # Find all matches with start indices
-        matches = list(chapter_pattern.finditer(content))
-        total_chapters = len(matches)
+        # Keep headings numbered I to XIII; any other numeral is not a chapter
+        # heading, so put it back into the text of the chapter before it
+        chapters = []
+        for i in range(1, len(parts), 4):
+            heading, roman_numeral, title_line, body = parts[i:i + 4]
+            if roman_numeral.upper() in ROMAN_NUMERALS:
+                chapters.append([heading, title_line, body])
+            elif chapters:
+                chapters[-1][2] += heading + body
+        total_chapters = len(chapters)
 
         if total_chapters != 13:
             sublime.message_dialog(f"Expected 13 chapters, found {total_chapters}. Aborting.")
@@ -29,13 +46,8 @@ class ExtractChaptersCustomCommand(sublime_plugin.TextCommand):
 
         folder = os.path.dirname(file_path)
 
-        for i, match in enumerate(matches):
-            start = match.start()
-            end = matches[i + 1].start() if i + 1 < len(matches) else len(content)
-            chapter_text = content[start:end].lstrip('\n')
-
-            roman_numeral = match.group(1)
-            title_line = match.group(2)
+        for i, (heading, title_line, body) in enumerate(chapters):
+            chapter_text = (heading + body).lstrip('\n')
 
             # Create filename
             arabic_num = i + 1
@@ -60,7 +72,6 @@ class ExtractChaptersCustomCommand(sublime_plugin.TextCommand):
             save_path = os.path.join(folder, filename)
 
             # Save chapter to file
-            with open(save_path, "w", encoding="utf-8") as f:
-                f.write(chapter_text)
+            Path(save_path).write_bytes(chapter_text.encode("utf-8"))
 
         sublime.message_dialog("Chapters successfully extracted and saved.")
\ No newline at end of file
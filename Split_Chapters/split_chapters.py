@@ -2,14 +2,20 @@ import sublime
 import sublime_plugin
 import os
 import re
+from pathlib import Path
+
+# Compiled once, when the plugin loads
+CHAPTER_PATTERN = re.compile(r'(\((\d+)\)\s+(.*))')
+UNSAFE_FILENAME_CHARS = re.compile(r'[\\/*?:"<>|]')
 
 class SplitChaptersCommand(sublime_plugin.TextCommand):
     def run(self, edit):
         text = self.view.substr(sublime.Region(0, self.view.size()))
-        pattern = r'\((\d+)\)\s+(.*)'
-        matches = list(re.finditer(pattern, text))
+        # Split on the headings; the captured groups are returned between
+        # the pieces: [front matter, heading, number, title, text, heading, ...]
+        parts = CHAPTER_PATTERN.split(text)
 
-        if not matches:
+        if len(parts) == 1:
             sublime.message_dialog("No chapters found.")
             return
 
@@ -20,20 +26,17 @@ class SplitChaptersCommand(sublime_plugin.TextCommand):
 
         folder = os.path.dirname(file_path)
 
-        for i in range(len(matches)):
-            chapter_start = matches[i].start()
-            chapter_end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        for i in range(1, len(parts), 4):
+            heading, chapter_number, chapter_title, body = parts[i:i + 4]
 
-            chapter_text = text[chapter_start:chapter_end].strip()
+            chapter_text = (heading + body).strip()
 
-            chapter_number = matches[i].group(1)
-            chapter_title = matches[i].group(2).strip()
-            safe_title = re.sub(r'[\\/*?:"<>|]', '', chapter_title)
+            chapter_title = chapter_title.strip()
+            safe_title = UNSAFE_FILENAME_CHARS.sub('', chapter_title)
 
             filename = f"G{chapter_number} {safe_title}.txt"
             filepath = os.path.join(folder, filename)
 
-            with open(filepath, "w", encoding="utf-8") as f:
-                f.write(chapter_text)
+            Path(filepath).write_bytes(chapter_text.encode("utf-8"))
 
         sublime.message_dialog("Chapters split successfully.")
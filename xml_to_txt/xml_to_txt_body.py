@@ -1,38 +1,48 @@
 #!/usr/bin/env python3
-import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from xml.etree import ElementTree as ET
 
 def extract_body_text(xml_path: Path) -> str:
-    tree = ET.parse(xml_path)
-    root = tree.getroot()
-
-    # Find <body> tag (case-insensitive search)
+    # Stream the file so that only the <body> subtree is held in memory
     body = None
-    for elem in root.iter():
-        if elem.tag.lower().endswith("body"):
-            body = elem
-            break
+    text = None
+    with open(xml_path, "rb") as f:
+        for event, elem in ET.iterparse(f, events=("start", "end")):
+            if event == "start":
+                # Find <body> tag (case-insensitive search)
+                if body is None and elem.tag.lower().endswith("body"):
+                    body = elem
+            elif elem is body:
+                text = ''.join(body.itertext())
+                body.clear()
+            elif body is None or text is not None:
+                # element closed outside <body>: not needed. Parsing still
+                # runs to the end so malformed files raise ParseError.
+                elem.clear()
 
-    if body is None:
+    if text is None:
         # fallback: no <body>, dump everything
-        text = ''.join(root.itertext())
-    else:
-        text = ''.join(body.itertext())
+        text = ''.join(ET.parse(xml_path).getroot().itertext())
+
+    # collapse whitespace (and strip the ends)
+    return ' '.join(text.split())
 
-    # collapse whitespace
-    text = re.sub(r'\s+', ' ', text)
-    return text.strip()
+def _convert_one(xml_file: Path) -> Path:
+    text = extract_body_text(xml_file)
+    out_file = xml_file.with_suffix(".txt")  # same folder, replace .xml with .txt
+    with open(out_file, "w", encoding="utf-8") as f:
+        f.write(text)
+    return out_file
 
 def convert_folder(input_folder: str):
     input_folder = Path(input_folder)
+    xml_files = list(input_folder.rglob("*.xml"))
 
-    for xml_file in input_folder.rglob("*.xml"):
-        text = extract_body_text(xml_file)
-        out_file = xml_file.with_suffix(".txt")  # same folder, replace .xml with .txt
-        with open(out_file, "w", encoding="utf-8") as f:
-            f.write(text)
-        print(f"Converted {xml_file} → {out_file}")
+    # each file is independent, so convert them in parallel
+    with ProcessPoolExecutor() as executor:
+        for xml_file, out_file in zip(xml_files, executor.map(_convert_one, xml_files)):
+            print(f"Converted {xml_file} → {out_file}")
 
 if __name__ == "__main__":
     import argparse